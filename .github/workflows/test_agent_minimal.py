@@ -9,28 +9,215 @@ import json
 import os
 import smtplib
 import logging
+import atexit
+import asyncio
+import re
+import time
+import argparse
+import socket
+import functools
 from datetime import datetime
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from email.message import EmailMessage
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Setup basic logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
+_SEP = "=" * 50
+
+# Email settings come from the workflow environment and never change mid-run
+_EMAIL_PASSWORD = os.environ.get('EMAIL_PASSWORD')
+_SENDER_EMAIL = os.environ.get('SENDER_EMAIL')
+_RECIPIENT_EMAIL = os.environ.get('RECIPIENT_EMAIL')
+
+# Cache DNS answers for the process lifetime; urllib3 and smtplib both resolve
+# through socket.getaddrinfo, so repeated connects skip the lookup
+socket.getaddrinfo = functools.lru_cache(maxsize=32)(socket.getaddrinfo)
+
+# (host, port) pairs resolved up front, matching how urllib3/smtplib call getaddrinfo
+_PRERESOLVE = (('plus-auto.ro', 443), ('smtp.gmail.com', 587))
+
+def _preresolve_hosts():
+    """Warm the DNS cache for every host the tests talk to"""
+    for host, port in _PRERESOLVE:
+        try:
+            socket.getaddrinfo(host, port, socket.AF_UNSPEC, socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            logger.warning("⚠️ DNS pre-resolution failed for %s: %s", host, e)
+
+_UA = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36'
+_HEADERS = {'User-Agent': _UA}
+
+# Shared HTTP session so repeated probes reuse the keep-alive TCP/TLS connection
+_SESSION = requests.Session()
+_SESSION.headers.update(_HEADERS)
+_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=10,
+    max_retries=Retry(total=2, backoff_factor=0.3)
+))
+atexit.register(_SESSION.close)
+
+# Cached SMTP connection, reused across sends and rotated after a fixed number of messages
+_SMTP = None
+_SMTP_MSG_COUNT = 0
+_SMTP_MAX_MESSAGES = 100
+
+class _PipeliningSMTP(smtplib.SMTP):
+    """smtplib.SMTP that sends MAIL FROM / RCPT TO / DATA in one write when the server allows PIPELINING"""
+    
+    # Mirrors stock SMTP.sendmail/mail/rcpt/data and leans on smtplib internals
+    # (_fix_eols, _quote_periods, _rset, bCRLF); re-check them on Python upgrades.
+    def sendmail(self, from_addr, to_addrs, msg, mail_options=(), rcpt_options=()):
+        self.ehlo_or_helo_if_needed()
+        if isinstance(to_addrs, str):
+            to_addrs = [to_addrs]
+        # SMTPUTF8 needs the extension check and UTF-8 command encoding that
+        # SMTP.mail() does, so non-ASCII envelopes take the stock path
+        if (not self.has_extn('pipelining')
+                or any(option.upper() == 'SMTPUTF8' for option in mail_options)
+                or not all(addr.isascii() for addr in [from_addr, *to_addrs])):
+            return super().sendmail(from_addr, to_addrs, msg, mail_options, rcpt_options)
+        
+        if isinstance(msg, str):
+            msg = smtplib._fix_eols(msg).encode('ascii')
+        
+        esmtp_opts = list(mail_options)
+        if self.has_extn('size'):
+            esmtp_opts.append("size=%d" % len(msg))
+        mail_args = ''.join(' ' + option for option in esmtp_opts)
+        rcpt_args = ''.join(' ' + option for option in rcpt_options)
+        
+        # Whole envelope in a single round trip, replies come back in order
+        commands = ["mail FROM:%s%s\r\n" % (smtplib.quoteaddr(from_addr), mail_args)]
+        commands += ["rcpt TO:%s%s\r\n" % (smtplib.quoteaddr(addr), rcpt_args) for addr in to_addrs]
+        commands.append("data\r\n")
+        self.send(''.join(commands))
+        
+        mail_code, mail_resp = self.getreply()
+        senderrs = {}
+        for addr in to_addrs:
+            code, resp = self.getreply()
+            if code not in (250, 251):
+                senderrs[addr] = (code, resp)
+        data_code, data_resp = self.getreply()
+        
+        if mail_code != 250:
+            self._abort_transaction(data_code)
+            raise smtplib.SMTPSenderRefused(mail_code, mail_resp, from_addr)
+        if len(senderrs) == len(to_addrs):
+            self._abort_transaction(data_code)
+            raise smtplib.SMTPRecipientsRefused(senderrs)
+        if data_code != 354:
+            self._rset()
+            raise smtplib.SMTPDataError(data_code, data_resp)
+        
+        body = smtplib._quote_periods(msg)
+        if body[-2:] != smtplib.bCRLF:
+            body += smtplib.bCRLF
+        self.send(body + b"." + smtplib.bCRLF)
+        code, resp = self.getreply()
+        if code != 250:
+            self._rset()
+            raise smtplib.SMTPDataError(code, resp)
+        return senderrs
+    
+    def _abort_transaction(self, data_code):
+        """Reset after a refused envelope; drop the socket if the server is already waiting for a body"""
+        if data_code == 354:
+            self.close()
+        else:
+            self._rset()
+
+def _close_smtp():
+    """Politely close the cached SMTP connection, if any"""
+    global _SMTP
+    if _SMTP is not None:
+        try:
+            _SMTP.quit()
+        except smtplib.SMTPException:
+            pass
+        _SMTP = None
+
+atexit.register(_close_smtp)
+
+def _get_smtp():
+    """Return a live, authenticated SMTP connection, reconnecting only when needed"""
+    global _SMTP, _SMTP_MSG_COUNT
+    
+    if _SMTP_MSG_COUNT >= _SMTP_MAX_MESSAGES:
+        _close_smtp()
+    
+    if _SMTP is not None:
+        try:
+            _SMTP.noop()
+            return _SMTP
+        except (smtplib.SMTPServerDisconnected, OSError):
+            _SMTP = None
+    
+    server = _PipeliningSMTP('smtp.gmail.com', 587)
+    try:
+        server.starttls()
+        server.login(_SENDER_EMAIL, _EMAIL_PASSWORD)
+    except Exception:
+        server.close()
+        raise
+    if not server.has_extn('pipelining'):
+        logger.info("ℹ️ SMTP server does not advertise PIPELINING - using one round trip per command")
+    _SMTP = server
+    _SMTP_MSG_COUNT = 0
+    return _SMTP
+
+_SITE_URL = "https://plus-auto.ro/"
+
+# Marker proving we got the real Romanian listing page (matched on raw bytes)
+_CONTENT_MARKER = b'autoturisme'
+_CONTENT_MARKER_RE = re.compile(re.escape(_CONTENT_MARKER), re.IGNORECASE)
+
+# The marker sits in the <title>/navigation, so the first 16 KB is enough
+_PROBE_BYTES = 16384
+_RANGE_HEADERS = {'Range': f'bytes=0-{_PROBE_BYTES - 1}'}
+
+def _probe_alive():
+    """Liveness check via HEAD - status and headers only, no body"""
+    response = _SESSION.head(_SITE_URL, timeout=10, allow_redirects=True)
+    logger.info("✅ Response code: %s", response.status_code)
+    logger.info("📄 Content length: %s", response.headers.get('Content-Length', 0))
+    
+    if response.status_code in (405, 501):
+        # HEAD not supported - let the content probe decide
+        logger.info("ℹ️ HEAD not supported, relying on content probe")
+        return True
+    return response.ok
+
+def _probe_content():
+    """Scan at most the first _PROBE_BYTES of the page for the content marker"""
+    with _SESSION.get(_SITE_URL, headers=_RANGE_HEADERS, timeout=15, stream=True) as response:
+        # Servers may ignore Range and send everything, so stop reading
+        # ourselves; the carried tail catches a marker split across chunks
+        scanned = 0
+        tail = b''
+        for chunk in response.iter_content(chunk_size=4096):
+            buf = tail + chunk
+            if _CONTENT_MARKER_RE.search(buf):
+                return True
+            scanned += len(chunk)
+            if scanned >= _PROBE_BYTES:
+                break
+            tail = buf[-len(_CONTENT_MARKER):]
+    return False
 
 def test_website_access():
     """Test if we can access plus-auto.ro"""
     logger.info("🌐 Testing plus-auto.ro access...")
     
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36'
-    }
-    
     try:
-        response = requests.get("https://plus-auto.ro/", headers=headers, timeout=15)
-        logger.info(f"✅ Response code: {response.status_code}")
-        logger.info(f"📄 Content length: {len(response.text)}")
+        if not _probe_alive():
+            logger.warning("⚠️ Website did not answer with a success status")
+            return False
         
-        if "autoturisme" in response.text.lower():
+        if _probe_content():
             logger.info("✅ Romanian automotive content detected")
             return True
         else:
@@ -38,103 +225,128 @@ def test_website_access():
             return False
             
     except Exception as e:
-        logger.error(f"❌ Website access failed: {e}")
+        logger.error("❌ Website access failed: %s", e)
         return False
 
 def test_email_config():
     """Test email configuration"""
     logger.info("📧 Testing email configuration...")
     
-    email_password = os.getenv('EMAIL_PASSWORD')
-    sender_email = os.getenv('SENDER_EMAIL') 
-    recipient_email = os.getenv('RECIPIENT_EMAIL')
-    
-    if not email_password:
-        logger.error("❌ EMAIL_PASSWORD not set")
-        return False
-    if not sender_email:
-        logger.error("❌ SENDER_EMAIL not set")
-        return False
-    if not recipient_email:
-        logger.error("❌ RECIPIENT_EMAIL not set")
-        return False
+    for name, value in (
+        ('EMAIL_PASSWORD', _EMAIL_PASSWORD),
+        ('SENDER_EMAIL', _SENDER_EMAIL),
+        ('RECIPIENT_EMAIL', _RECIPIENT_EMAIL)
+    ):
+        if not value:
+            logger.error("❌ %s not set", name)
+            return False
         
     logger.info("✅ All email environment variables set")
     return True
 
-def send_test_email():
-    """Send a simple test email"""
-    logger.info("📤 Sending test email...")
-    
-    try:
-        sender_email = os.getenv('SENDER_EMAIL')
-        email_password = os.getenv('EMAIL_PASSWORD')
-        recipient_email = os.getenv('RECIPIENT_EMAIL')
-        
-        # Create message
-        msg = MIMEMultipart()
-        msg['From'] = sender_email
-        msg['To'] = recipient_email
-        msg['Subject'] = f"Plus-Auto.ro Agent Test - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
-        
-        body = f"""
+# Static parts of the test email; only the timestamps change per send
+_SUBJECT_TEMPLATE = "Plus-Auto.ro Agent Test - {ts:%Y-%m-%d %H:%M}"
+_BODY_TEMPLATE = """
 🧪 GITHUB ACTIONS TEST SUCCESSFUL!
 
 ✅ Agent execution: Working
 ✅ Website access: Tested  
 ✅ Email delivery: Working
-⏰ Test time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+⏰ Test time: {ts:%Y-%m-%d %H:%M:%S}
 
 This confirms your agent can run successfully in GitHub Actions.
 Ready for full deployment! 🚀
 """
+
+def _build_msg(ts, eight_bit):
+    """Stamp the prebuilt test email template with the send time"""
+    msg = EmailMessage()
+    msg['From'] = _SENDER_EMAIL
+    msg['To'] = _RECIPIENT_EMAIL
+    msg['Subject'] = _SUBJECT_TEMPLATE.format(ts=ts)
+    # The emoji body would go out as raw 8-bit; keep it 7-bit clean unless the server takes 8BITMIME
+    msg.set_content(_BODY_TEMPLATE.format(ts=ts), cte=None if eight_bit else 'quoted-printable')
+    return msg
+
+def send_test_email():
+    """Send a simple test email"""
+    global _SMTP_MSG_COUNT
+    logger.info("📤 Sending test email...")
+    
+    try:
+        # Send email over the cached connection (kept open for the next send)
+        server = _get_smtp()
+        eight_bit = server.has_extn('8bitmime')
         
-        msg.attach(MIMEText(body, 'plain'))
-        
-        # Send email
-        server = smtplib.SMTP('smtp.gmail.com', 587)
-        server.starttls()
-        server.login(sender_email, email_password)
-        server.send_message(msg)
-        server.quit()
+        # Create message
+        msg = _build_msg(datetime.now(), eight_bit)
+        server.send_message(msg, mail_options=('BODY=8BITMIME',) if eight_bit else ())
+        _SMTP_MSG_COUNT += 1
         
         logger.info("✅ Test email sent successfully")
         return True
         
     except Exception as e:
-        logger.error(f"❌ Email sending failed: {e}")
+        logger.error("❌ Email sending failed: %s", e)
         return False
 
+async def run_network_tests():
+    """Run the I/O-bound tests (website access, email sending) concurrently"""
+    return await asyncio.gather(
+        asyncio.to_thread(test_website_access),
+        asyncio.to_thread(send_test_email)
+    )
+
 def main():
     """Main test function"""
     logger.info("🧪 Starting Plus-Auto.ro Agent Test")
-    logger.info("="*50)
+    logger.info(_SEP)
+    
+    _preresolve_hosts()
     
     success_count = 0
     total_tests = 3
     
-    # Test 1: Website access
-    if test_website_access():
-        success_count += 1
-        
-    # Test 2: Email configuration  
+    # Test 2: Email configuration (local check, no network)
     if test_email_config():
         success_count += 1
-        
-    # Test 3: Email sending
-    if send_test_email():
-        success_count += 1
     
-    logger.info("="*50)
-    logger.info(f"🎯 TEST RESULTS: {success_count}/{total_tests} passed")
+    # Tests 1 + 3: Website access and email sending overlap their network waits
+    website_ok, email_ok = asyncio.run(run_network_tests())
+    success_count += website_ok + email_ok
+    
+    logger.info(_SEP)
+    logger.info("🎯 TEST RESULTS: %d/%d passed", success_count, total_tests)
     
     if success_count == total_tests:
         logger.info("✅ ALL TESTS PASSED - Agent ready for deployment!")
         return 0
     else:
-        logger.error(f"❌ {total_tests - success_count} tests failed")
+        logger.error("❌ %d tests failed", total_tests - success_count)
         return 1
 
+def parse_args():
+    """Command line options for batch runs"""
+    parser = argparse.ArgumentParser(description="Minimal Plus-Auto.ro test agent")
+    parser.add_argument('--iterations', type=int, default=1,
+                        help="number of test rounds to run in this process (default: 1)")
+    parser.add_argument('--interval', type=float, default=0,
+                        help="seconds to wait between rounds (default: 0)")
+    args = parser.parse_args()
+    if args.iterations < 1:
+        parser.error("--iterations must be at least 1")
+    if args.interval < 0:
+        parser.error("--interval must not be negative")
+    return args
+
 if __name__ == "__main__":
-    exit_code = main()
+    args = parse_args()
+    
+    # Rounds share the pooled HTTP session and cached SMTP connection;
+    # both are closed by their atexit hooks once the loop finishes
+    exit_code = 0
+    for i in range(args.iterations):
+        if i:
+            time.sleep(args.interval)
+        exit_code = max(exit_code, main())
     exit(exit_code)
@@ -10,16 +10,319 @@ import json
 import sqlite3
 from datetime import datetime, timedelta
 import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from email.message import EmailMessage
 import logging
+from logging.handlers import RotatingFileHandler
+import gzip
+import base64
+import atexit
 import time
 import os
 import asyncio
+import threading
 import re
-from typing import Dict, List, Optional, Any
-import pandas as pd
-from bs4 import BeautifulSoup
+from string import Template
+import itertools
+from operator import itemgetter
+from html import unescape
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, Optional, Tuple, Any
+import numpy as np
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # Optional speed-up; stdlib json is the fallback
+    orjson = None
+
+# Report accent colour per insight impact level
+_IMPACT_COLORS = {"high": "#dc3545", "medium": "#fd7e14", "low": "#28a745"}
+# Required insight fields, unpacked in one C-level call per report card
+_INSIGHT_FIELDS = itemgetter("type", "title", "description", "confidence", "impact")
+
+# Price segment boundaries (EUR): [29k, 40k) is mid-range, 100k and up is luxury
+_SEGMENT_EDGES = np.array([29000, 40000, 100000], dtype=np.int32)
+_MID_RANGE_SEGMENT = 1
+_LUXURY_SEGMENT = 3
+
+# Dealers featured in the report and saved per session
+_TOP_DEALERS = 3
+
+# Fallback demo dataset, built once and read-only so every fallback run shares it
+_SIMULATION_PRICES = np.array([
+    20590, 4990, 5290, 22590, 28490, 18490, 28000, 31313, 29992, 
+    6000, 9950, 46325, 43234, 42868, 40224, 35072, 49451, 70326, 
+    141840, 147684, 118936, 121745, 88217, 59900, 640588, 232078
+], dtype=np.int32)
+_SIMULATION_PRICES.flags.writeable = False
+_SIMULATION_DATA = MappingProxyType({
+    "total_listings": 29099,
+    "price_samples": _SIMULATION_PRICES,
+    # Plain dicts: the top dealers are JSON-serialised with the session
+    "dealer_data": (
+        {"name": "autorulateleasing", "listing_count": 537},
+        {"name": "autodel", "listing_count": 310},
+        {"name": "parc-auto-dragoliv-sascut", "listing_count": 248},
+        {"name": "wow-auto-rulate", "listing_count": 194},
+        {"name": "radacini-auto-rulate", "listing_count": 187}
+    ),
+    "market_indicators": MappingProxyType({"simulation_mode": True})
+})
+
+# Scraping politeness: bounded parallelism plus a minimum spacing between request starts
+_MAX_CONCURRENT_REQUESTS = 8
+_MIN_REQUEST_INTERVAL = 0.25  # seconds
+_HOMEPAGE_SCAN_BYTES = 256 * 1024
+
+# Statuses worth another try: throttling and transient server errors
+_RETRY_STATUSES = (429, 500, 502, 503, 504)
+_MAX_RETRY_AFTER = 30  # seconds
+
+
+class _PoliteRetry(Retry):
+    """Retry that honours Retry-After, capped so one throttled page can't stall the run"""
+    
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, _MAX_RETRY_AFTER)
+
+
+# Page parsing patterns, compiled once at import
+_LISTING_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r'(\d{1,3}(?:[\.,]\d{3})*)\s*autoturisme',
+    r'(\d{1,3}(?:[\.,]\d{3})*)\s*rezultate',
+    r'(\d{1,3}(?:[\.,]\d{3})*)\s*anun'
+)]
+# "€ 12.345", "12.345 €" and "12.345 EUR" fused into one alternation for a single scan
+_PRICE_RE = re.compile(r'€\s*(\d{1,3}(?:[.,]\d{3})*)|(\d{1,3}(?:[.,]\d{3})*)\s*(?:€|EUR)')
+# Markup that BeautifulSoup's get_text() leaves out, and the tags themselves
+_NON_TEXT_RE = re.compile(r'<!--.*?-->|<(script|style|template)\b.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+# As in html.parser, a tag opens only at '<' plus a letter, '/', '!' or '?', and a quoted
+# attribute value may contain '>' (alt="Pret > 45.000 €"). Unrolled: plain runs are
+# one character class and each loop step starts at a quote, so nothing backtracks.
+_TAG_BODY = r"""<[A-Za-z/!?][^>"']*(?:(?:"[^"]*"|'[^']*')[^>"']*)*"""
+_TAG_RE = re.compile(_TAG_BODY + '>')
+# What a truncated page can end inside: an unclosed non-text block or a cut-off tag
+_UNCLOSED_MARKUP_RE = re.compile(
+    r'<!--|<(?:script|style|template)\b|' + _TAG_BODY + r"""(?:"[^"]*|'[^']*)?$""", re.IGNORECASE
+)
+
+
+def _response_encoding(response: requests.Response) -> str:
+    """Charset to decode the page with"""
+    # requests assumes ISO-8859-1 for text/html without a charset; the site is UTF-8
+    if 'charset' in response.headers.get('Content-Type', '').lower():
+        return response.encoding or 'utf-8'
+    return 'utf-8'
+
+
+def _html_text(html: str) -> str:
+    """Visible text of an HTML page without building a parse tree
+    
+    Equivalent to BeautifulSoup(html).get_text() for our regex scans:
+    comments/scripts/styles dropped, tags stripped, entities unescaped.
+    """
+    return unescape(_TAG_RE.sub('', _NON_TEXT_RE.sub('', html)))
+
+
+def _html_prefix_text(html_prefix: str) -> str:
+    """Visible text of the first part of a page
+    
+    Complete non-text blocks are dropped as usual; a block or tag the cut
+    left open is dropped to the end, so its body never reads as text.
+    """
+    html = _NON_TEXT_RE.sub('', html_prefix)
+    match = _UNCLOSED_MARKUP_RE.search(html)
+    if match:
+        html = html[:match.start()]
+    return unescape(_TAG_RE.sub('', html))
+
+
+def _page_text(response: requests.Response) -> str:
+    """Visible text of a fully downloaded page"""
+    return _html_text(response.content.decode(_response_encoding(response), errors='replace'))
+
+
+def _match_total_listings(text_content: str) -> Optional[int]:
+    """Total ads count from the first listing pattern that matches, if any"""
+    for pattern in _LISTING_PATTERNS:
+        match = pattern.search(text_content)
+        if match:
+            return int(match.group(1).replace('.', '').replace(',', ''))
+    return None
+
+
+_DEALER_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r'Anunțuri\s*\((\d+)\)',
+    r'(\d+)\s*anun',
+    r'(\d+)\s*listing'
+)]
+
+
+# Session inserts; sqlite3 caches their prepared statements by SQL text on the shared connection
+_INSERT_SESSION_SQL = """
+    INSERT INTO intelligence_sessions 
+    (session_id, timestamp, mode, insights_generated, confidence_average, data_points)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+_INSERT_MARKETPLACE_SQL = """
+    INSERT INTO marketplace_intelligence
+    (session_id, timestamp, total_listings, avg_price, median_price, 
+     luxury_percentage, market_trend, raw_data)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_INSERT_DEALER_SQL = """
+    INSERT INTO dealer_intelligence
+    (session_id, timestamp, dealer_name, listing_count, market_share)
+    VALUES (?, ?, ?, ?, ?)
+"""
+_INSERT_INSIGHT_SQL = """
+    INSERT INTO ai_insights
+    (session_id, timestamp, insight_type, title, description, 
+     confidence_score, impact_level, recommendation)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _price_stats(prices: np.ndarray) -> Tuple[float, float, float, float, int, int]:
+    """All price aggregates in one place: mean, quartiles and segment counts
+    
+    Each step is a single vectorised C pass over the packed int32 array.
+    """
+    mean = float(prices.mean())
+    # Quartiles from one partition of the array; the middle one is the median
+    lower_quartile, median, upper_quartile = (float(q) for q in np.percentile(prices, (25, 50, 75)))
+    # Bucket every price once, then read off the segment counts
+    segment_counts = np.bincount(np.digitize(prices, _SEGMENT_EDGES), minlength=len(_SEGMENT_EDGES) + 1)
+    return (mean, lower_quartile, median, upper_quartile,
+            int(segment_counts[_MID_RANGE_SEGMENT]), int(segment_counts[_LUXURY_SEGMENT]))
+
+
+def _dealers_to_soa(dealers: List[Dict[str, Any]]) -> Tuple[List[str], np.ndarray]:
+    """Dealer names and listing counts as parallel columns
+    
+    The scraped list of dicts stays the format for JSON, the database and the
+    report; rankings and reductions work on the packed counts column instead.
+    """
+    names = [dealer["name"] for dealer in dealers]
+    counts = np.fromiter((dealer.get("listing_count", 0) for dealer in dealers),
+                         dtype=np.int64, count=len(dealers))
+    return names, counts
+
+
+if orjson is not None:
+    def _load_json(data: bytes) -> Any:
+        """Parse JSON bytes"""
+        return orjson.loads(data)
+    
+    def _dump_json(obj: Any, pretty: bool = False) -> bytes:
+        """Serialise to UTF-8 JSON bytes"""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+else:
+    def _load_json(data: bytes) -> Any:
+        """Parse JSON bytes"""
+        return json.loads(data)
+    
+    def _dump_json(obj: Any, pretty: bool = False) -> bytes:
+        """Serialise to UTF-8 JSON bytes"""
+        return json.dumps(obj, indent=2 if pretty else None).encode('utf-8')
+
+
+def _fmt_euro(value: float) -> str:
+    """Whole-euro amount with thousands separators, as shown in reports and insights"""
+    return f"€{value:,.0f}"
+
+
+def _fmt_pct1(value: float) -> str:
+    """Percentage with one decimal, as shown in reports and insights"""
+    return f"{value:.1f}%"
+
+
+# Static report skeleton, read and specialised once at import; reports only fill in the $placeholders
+_TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+
+
+def _read_template(name: str) -> str:
+    """Read a report template file shipped next to this module"""
+    with open(os.path.join(_TEMPLATE_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def _compile_template(template: Template) -> Callable[..., str]:
+    """Specialise a string.Template into literal runs and slots, once
+    
+    Same output as template.substitute(**values), but rendering is a single
+    join instead of a regex scan over the whole text on every call.
+    """
+    parts: List[str] = []
+    slots: List[Tuple[int, str]] = []
+    literal_start = 0
+    for match in template.pattern.finditer(template.template):
+        literal = template.template[literal_start:match.start()]
+        name = match.group("named") or match.group("braced")
+        if match.group("escaped") is not None:
+            literal += template.delimiter
+        elif name is None:
+            raise ValueError(f"Invalid placeholder in report template at offset {match.start()}")
+        parts.append(literal)
+        if name is not None:
+            slots.append((len(parts), name))
+            parts.append("")
+        literal_start = match.end()
+    parts.append(template.template[literal_start:])
+    
+    def render(**values: Any) -> str:
+        filled = parts.copy()
+        for index, name in slots:
+            filled[index] = str(values[name])
+        return "".join(filled)
+    
+    return render
+
+
+# Directories already created by this process; later agents skip the syscalls
+_READY_DIRS = set()
+
+
+def _ensure_dir(path: str):
+    """os.makedirs(path, exist_ok=True), at most once per process per directory"""
+    # Absolute key: the configured paths are relative, and the cwd may change between agents
+    key = os.path.abspath(path)
+    if key not in _READY_DIRS:
+        os.makedirs(key, exist_ok=True)
+        _READY_DIRS.add(key)
+
+
+def _compress_report(report_html: str) -> bytes:
+    """Gzip the report once for both the archive file and the email attachment"""
+    # The HTML is mostly repeated markup and CSS, so it shrinks >10x
+    return gzip.compress(report_html.encode('utf-8'), compresslevel=6)
+
+
+def _write_report_file(path: str, report_gz: bytes):
+    """Write an already gzip-compressed report to disk"""
+    with open(path, 'wb') as f:
+        f.write(report_gz)
+
+
+# Header background pattern, inlined as a base64 data URL (no URL-escaping pitfalls)
+_HEADER_SVG_URL = "data:image/svg+xml;base64," + base64.b64encode(
+    _read_template("report_header.svg").strip().encode("utf-8")
+).decode("ascii")
+
+# The stylesheet never changes, so splice it into the skeleton once instead of per report
+_REPORT_CSS = Template(_read_template("intelligence_report.css")).substitute(
+    header_svg_url=_HEADER_SVG_URL
+).rstrip("\n")
+_render_report = _compile_template(Template(
+    Template(_read_template("intelligence_report.html")).safe_substitute(
+        report_css=_REPORT_CSS.replace("$", "$$")
+    )
+))
 
 
 class YourToqanAgent:
@@ -33,16 +336,19 @@ class YourToqanAgent:
         self.load_config(config_file)
         self.setup_logging()
         self.setup_database()
+        self.setup_http_session()
+        self.setup_email()
+        self.setup_reports_directory()
         
     def load_config(self, config_file: str):
         """Load your personal agent configuration"""
         try:
-            with open(config_file, 'r') as f:
-                self.config = json.load(f)
+            with open(config_file, 'rb') as f:
+                self.config = _load_json(f.read())
         except FileNotFoundError:
             self.config = self.create_your_config()
-            with open(config_file, 'w') as f:
-                json.dump(self.config, f, indent=2)
+            with open(config_file, 'wb') as f:
+                f.write(_dump_json(self.config, pretty=True))
                 
     def create_your_config(self) -> Dict[str, Any]:
         """Create your personalized configuration"""
@@ -94,100 +400,214 @@ class YourToqanAgent:
     
     def setup_logging(self):
         """Setup your personal logging system"""
-        log_dir = "agent_logs"
-        os.makedirs(log_dir, exist_ok=True)
-        
-        log_filename = f"{log_dir}/your_agent_{datetime.now().strftime('%Y%m')}.log"
+        logger = logging.getLogger("YourToqanAgent")
+        self.logger = logger
+        if not logger.handlers:  # Configure once per process, not per agent
+            log_dir = "agent_logs"
+            _ensure_dir(log_dir)
+            
+            log_filename = f"{log_dir}/your_agent_{datetime.now().strftime('%Y%m')}.log"
+            
+            # Size-capped: the monthly log rolls over at 5 MB, keeping 5 old files
+            file_handler = RotatingFileHandler(log_filename, maxBytes=5 * 1024 * 1024, backupCount=5,
+                                               encoding='utf-8', delay=True)
+            formatter = logging.Formatter('%(asctime)s - YourAgent - %(levelname)s - %(message)s')
+            for handler in (file_handler, logging.StreamHandler()):
+                handler.setFormatter(formatter)
+                logger.addHandler(handler)
+            logger.setLevel(logging.INFO)
+            logger.propagate = False  # Our handlers only; leave the root logger to the host app
         
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - YourAgent - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(log_filename),
-                logging.StreamHandler()
-            ]
-        )
-        self.logger = logging.getLogger("YourToqanAgent")
         self.logger.info(f"🤖 Your Toqan Agent initialized in {self.mode} mode")
         
+    def _connect_database(self) -> sqlite3.Connection:
+        """Open the intelligence database tuned for this analytics workload"""
+        # Shared by the event loop and worker threads, never used concurrently
+        conn = sqlite3.connect(self.config["storage"]["database_path"], check_same_thread=False)
+        # WAL + NORMAL: far fewer fsyncs per commit, readers don't block the writer.
+        # A lost last transaction only means re-running the agent.
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA mmap_size=268435456")
+        conn.execute("PRAGMA foreign_keys=ON")
+        # Wait out a concurrent writer instead of failing with "database is locked"
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute("PRAGMA cache_size=-20000")  # ~20 MB page cache
+        return conn
+        
     def setup_database(self):
         """Setup your intelligence database"""
-        db_path = self.config["storage"]["database_path"]
-        conn = sqlite3.connect(db_path)
+        # One long-lived connection for the agent: pragmas and page cache stay warm
+        self.db = self._connect_database()
+        self._db_lock = threading.Lock()  # Saves run on worker threads; one writer at a time
+        # Safety net for agents that never reach aclose(), which takes the hook off again
+        atexit.register(self.db.close)
+        conn = self.db
         
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS intelligence_sessions (
-                id INTEGER PRIMARY KEY,
-                session_id TEXT UNIQUE,
-                timestamp TEXT,
-                mode TEXT,
-                execution_time REAL,
-                insights_generated INTEGER,
-                confidence_average REAL,
-                data_points INTEGER
-            )
-        """)
+        # Schema setup as one transaction: a single commit instead of one per statement
+        # (sqlite3 doesn't open transactions implicitly for DDL)
+        with conn:
+            conn.execute("BEGIN")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS intelligence_sessions (
+                    id INTEGER PRIMARY KEY,
+                    session_id TEXT UNIQUE,
+                    timestamp TEXT,
+                    mode TEXT,
+                    execution_time REAL,
+                    insights_generated INTEGER,
+                    confidence_average REAL,
+                    data_points INTEGER
+                )
+            """)
         
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS marketplace_intelligence (
-                id INTEGER PRIMARY KEY,
-                session_id TEXT,
-                timestamp TEXT,
-                total_listings INTEGER,
-                avg_price REAL,
-                median_price REAL,
-                luxury_percentage REAL,
-                market_trend TEXT,
-                prediction TEXT,
-                raw_data TEXT,
-                FOREIGN KEY (session_id) REFERENCES intelligence_sessions (session_id)
-            )
-        """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS marketplace_intelligence (
+                    id INTEGER PRIMARY KEY,
+                    session_id TEXT,
+                    timestamp TEXT,
+                    total_listings INTEGER,
+                    avg_price REAL,
+                    median_price REAL,
+                    luxury_percentage REAL,
+                    market_trend TEXT,
+                    prediction TEXT,
+                    raw_data TEXT,
+                    FOREIGN KEY (session_id) REFERENCES intelligence_sessions (session_id)
+                )
+            """)
         
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS dealer_intelligence (
-                id INTEGER PRIMARY KEY,
-                session_id TEXT,
-                timestamp TEXT,
-                dealer_name TEXT,
-                listing_count INTEGER,
-                market_share REAL,
-                performance_score REAL,
-                strategic_insight TEXT,
-                FOREIGN KEY (session_id) REFERENCES intelligence_sessions (session_id)
-            )
-        """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS dealer_intelligence (
+                    id INTEGER PRIMARY KEY,
+                    session_id TEXT,
+                    timestamp TEXT,
+                    dealer_name TEXT,
+                    listing_count INTEGER,
+                    market_share REAL,
+                    performance_score REAL,
+                    strategic_insight TEXT,
+                    FOREIGN KEY (session_id) REFERENCES intelligence_sessions (session_id)
+                )
+            """)
         
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS ai_insights (
-                id INTEGER PRIMARY KEY,
-                session_id TEXT,
-                timestamp TEXT,
-                insight_type TEXT,
-                title TEXT,
-                description TEXT,
-                confidence_score REAL,
-                impact_level TEXT,
-                recommendation TEXT,
-                FOREIGN KEY (session_id) REFERENCES intelligence_sessions (session_id)
-            )
-        """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS ai_insights (
+                    id INTEGER PRIMARY KEY,
+                    session_id TEXT,
+                    timestamp TEXT,
+                    insight_type TEXT,
+                    title TEXT,
+                    description TEXT,
+                    confidence_score REAL,
+                    impact_level TEXT,
+                    recommendation TEXT,
+                    FOREIGN KEY (session_id) REFERENCES intelligence_sessions (session_id)
+                )
+            """)
         
-        conn.commit()
-        conn.close()
+            # SQLite doesn't index foreign keys itself; session lookups would full-scan
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_mi_session ON marketplace_intelligence (session_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_di_session ON dealer_intelligence (session_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_ai_session ON ai_insights (session_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_ts ON intelligence_sessions (timestamp)")
         
-    def make_intelligent_request(self, url: str) -> requests.Response:
-        """Make intelligent requests with proper handling"""
-        headers = {
+    def setup_http_session(self):
+        """Setup a pooled keep-alive HTTP session shared by all requests"""
+        self.session = requests.Session()
+        self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
             'Connection': 'keep-alive'
-        }
+        })
+        self.session.mount("https://", HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=16,
+            # Exponential backoff on connection errors, throttling and transient 5xx;
+            # the last response is returned rather than raised so callers see the status
+            max_retries=_PoliteRetry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=_RETRY_STATUSES,
+                respect_retry_after_header=True,
+                raise_on_status=False
+            )
+        ))
+        # Dedicated blocking-request workers: exactly as many as may be in flight,
+        # and never queued behind database or SMTP jobs on the default executor
+        self._http_executor = ThreadPoolExecutor(max_workers=_MAX_CONCURRENT_REQUESTS,
+                                                 thread_name_prefix="agent-http")
+        
+    def setup_email(self):
+        """Precompute the static parts of the report email"""
+        self._sender_email = self.config["email"]["sender_email"]
+        self._recipients_hdr = ', '.join(self.config["email"]["recipients"])
+        self._smtp = None  # Opened lazily on the first report send
+        
+    def setup_reports_directory(self):
+        """Create the reports directory once, up front"""
+        self._reports_dir = self.config["storage"]["reports_directory"]
+        _ensure_dir(self._reports_dir)
         
-        response = requests.get(url, headers=headers, timeout=15)
-        time.sleep(2)  # Respectful delay
-        return response
+    def make_intelligent_request(self, url: str, method: str = "GET") -> requests.Response:
+        """Make intelligent requests with proper handling"""
+        if method == "HEAD":
+            # Existence probe only: no body, short timeout, don't chase redirects
+            return self.session.head(url, timeout=5, allow_redirects=False)
+        return self.session.get(url, timeout=15)
+    
+    def scan_total_listings(self, url: str) -> Optional[int]:
+        """Read the homepage only until the total ads count shows up"""
+        with self.session.get(url, timeout=15, stream=True) as response:
+            encoding = _response_encoding(response)
+            # The count sits in the header / first fold - skip the rest of the page
+            head = response.raw.read(_HOMEPAGE_SCAN_BYTES, decode_content=True)
+            total = _match_total_listings(_html_prefix_text(head.decode(encoding, errors='ignore')))
+            if total is None:
+                # Not near the top after all: finish reading this same response
+                head += response.raw.read(decode_content=True)
+                total = _match_total_listings(_html_text(head.decode(encoding, errors='replace')))
+        return total
+    
+    # Page parsing is done by the same worker thread that downloaded the page,
+    # so the event loop only ever sees the extracted numbers
+    def scan_page_prices(self, url: str) -> List[int]:
+        """Blocking: fetch one listing page and parse its prices on the HTTP worker"""
+        return self.extract_prices_intelligently(_page_text(self.make_intelligent_request(url)))
+    
+    def scan_dealer_listings(self, url: str) -> Optional[int]:
+        """Blocking: fetch a dealer page and parse its listing count; None if the page is gone"""
+        response = self.make_intelligent_request(url)
+        if response.status_code == 404:
+            return None
+        
+        # Intelligent listing count extraction
+        text_content = _page_text(response)
+        for pattern in _DEALER_PATTERNS:
+            match = pattern.search(text_content)
+            if match:
+                return int(match.group(1))
+        return 0
+    
+    async def fetch_page(self, url: str, method: str = "GET") -> requests.Response:
+        """Fetch a page off the event loop, within the concurrency and rate limits"""
+        return await self._run_request(self.make_intelligent_request, url, method)
+    
+    async def _run_request(self, request_func, *args):
+        """Run a blocking request call in a worker thread, within the concurrency and rate limits"""
+        async with self._request_semaphore:
+            await self._wait_for_request_slot()
+            return await asyncio.get_running_loop().run_in_executor(self._http_executor, request_func, *args)
+    
+    async def _wait_for_request_slot(self):
+        """Respectful delay: start requests at most once per _MIN_REQUEST_INTERVAL"""
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self._next_request_slot)
+        self._next_request_slot = slot + _MIN_REQUEST_INTERVAL
+        if slot > now:
+            await asyncio.sleep(slot - now)
 
     def validate_marketplace_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """🔍 Validate scraped marketplace data for accuracy and completeness"""
@@ -216,8 +636,8 @@ class YourToqanAgent:
             self.logger.info(f"✅ Total listings validation passed: {total_listings:,} ads")
         
         # Validate price samples
-        price_samples = data.get("price_samples", [])
-        if not price_samples:
+        price_samples = np.asarray(data.get("price_samples", []), dtype=np.int32)
+        if price_samples.size == 0:
             validation_results["warnings"].append("⚠️  No price samples collected")
             validation_results["data_quality_score"] -= 15
         elif len(price_samples) < 10:
@@ -225,15 +645,15 @@ class YourToqanAgent:
             validation_results["data_quality_score"] -= 10
         else:
             # Check for reasonable price ranges (EUR)
-            avg_price = sum(price_samples) / len(price_samples)
+            avg_price = float(price_samples.mean())
             if avg_price < 1000:
-                validation_results["warnings"].append(f"⚠️  Suspiciously low average price: €{avg_price:,.0f}")
+                validation_results["warnings"].append(f"⚠️  Suspiciously low average price: {_fmt_euro(avg_price)}")
                 validation_results["data_quality_score"] -= 15
             elif avg_price > 100000:
-                validation_results["warnings"].append(f"⚠️  Suspiciously high average price: €{avg_price:,.0f}")
+                validation_results["warnings"].append(f"⚠️  Suspiciously high average price: {_fmt_euro(avg_price)}")
                 validation_results["data_quality_score"] -= 15
             else:
-                self.logger.info(f"✅ Price validation passed: €{avg_price:,.0f} average")
+                self.logger.info(f"✅ Price validation passed: {_fmt_euro(avg_price)} average")
         
         # Validate dealer data
         dealer_data = data.get("dealer_data", [])
@@ -260,70 +680,55 @@ class YourToqanAgent:
         
         return validation_results
     
-    def extract_marketplace_data(self) -> Dict[str, Any]:
+    async def extract_marketplace_data(self) -> Dict[str, Any]:
         """Extract marketplace data using intelligent analysis"""
         self.logger.info("🔍 Extracting marketplace data...")
         
         data = {
             "total_listings": 0,
-            "price_samples": [],
+            "price_samples": np.empty(0, dtype=np.int32),
             "dealer_data": [],
             "market_indicators": {}
         }
         
+        # Created per run so they bind to the running event loop
+        self._request_semaphore = asyncio.Semaphore(_MAX_CONCURRENT_REQUESTS)
+        self._next_request_slot = 0.0
+        
         try:
-            # Get homepage data
-            response = self.make_intelligent_request(f"{self.config['analysis']['target_url']}/")
-            soup = BeautifulSoup(response.content, 'html.parser')
+            target_url = self.config['analysis']['target_url']
+            page_urls = [page_url for page_url in self.config['analysis']['pages_to_analyze'] if page_url != "/"]
             
-            # Extract total listings with intelligent parsing
-            text_content = soup.get_text()
-            patterns = [
-                r'(\d{1,3}(?:[\.,]\d{3})*)\s*autoturisme',
-                r'(\d{1,3}(?:[\.,]\d{3})*)\s*rezultate',
-                r'(\d{1,3}(?:[\.,]\d{3})*)\s*anun'
-            ]
+            # Fetch homepage, listing pages and dealer pages concurrently
+            homepage = asyncio.ensure_future(self._run_request(self.scan_total_listings, f"{target_url}/"))
+            page_prices, dealer_infos = await asyncio.gather(
+                asyncio.gather(*(self.extract_page_prices(page_url) for page_url in page_urls)),
+                asyncio.gather(*(self.extract_dealer_intelligence(dealer_slug)
+                                 for dealer_slug in self.config['analysis']['dealers_to_track']))
+            )
+            total_listings = await homepage
             
-            for pattern in patterns:
-                match = re.search(pattern, text_content, re.IGNORECASE)
-                if match:
-                    number_str = match.group(1).replace('.', '').replace(',', '')
-                    data["total_listings"] = int(number_str)
+            # Extract total listings with intelligent parsing
+            if total_listings is not None:
+                data["total_listings"] = total_listings
 
-                    # 🔍 DATA VALIDATION: Ensure scraped data makes sense
-                    if data["total_listings"] < 1000:
-                        self.logger.warning(f"⚠️  Suspiciously low ad count: {data['total_listings']} - might be scraping issue")
-                    elif data["total_listings"] > 100000:
-                        self.logger.warning(f"⚠️  Suspiciously high ad count: {data['total_listings']} - might be scraping issue")
-                    else:
-                        self.logger.info(f"✅ Valid ad count detected: {data['total_listings']:,} ads")
-                    break
+                # 🔍 DATA VALIDATION: Ensure scraped data makes sense
+                if data["total_listings"] < 1000:
+                    self.logger.warning(f"⚠️  Suspiciously low ad count: {data['total_listings']} - might be scraping issue")
+                elif data["total_listings"] > 100000:
+                    self.logger.warning(f"⚠️  Suspiciously high ad count: {data['total_listings']} - might be scraping issue")
+                else:
+                    self.logger.info(f"✅ Valid ad count detected: {data['total_listings']:,} ads")
             
             if data["total_listings"] == 0:
                 data["total_listings"] = 29099  # Fallback from our analysis
             
             # Collect pricing data from multiple pages
-            for page_url in self.config['analysis']['pages_to_analyze']:
-                if page_url == "/":
-                    continue
-                    
-                try:
-                    full_url = f"{self.config['analysis']['target_url']}{page_url}"
-                    response = self.make_intelligent_request(full_url)
-                    soup = BeautifulSoup(response.content, 'html.parser')
-                    
-                    # Extract prices intelligently
-                    prices = self.extract_prices_intelligently(soup)
-                    data["price_samples"].extend(prices)
-                    
-                except Exception as e:
-                    self.logger.warning(f"Error extracting from {page_url}: {e}")
+            # Packed int32 array rather than a list of boxed ints
+            data["price_samples"] = np.fromiter(itertools.chain.from_iterable(page_prices), dtype=np.int32)
             
             # Collect dealer intelligence
-            for dealer_slug in self.config['analysis']['dealers_to_track']:
-                dealer_info = self.extract_dealer_intelligence(dealer_slug)
-                if dealer_info:
-                    data["dealer_data"].append(dealer_info)
+            data["dealer_data"] = [dealer_info for dealer_info in dealer_infos if dealer_info]
             
             self.logger.info(f"✅ Extracted data: {len(data['price_samples'])} prices, {len(data['dealer_data'])} dealers")
             return data
@@ -333,57 +738,43 @@ class YourToqanAgent:
             # Return simulation data for demo
             return self.get_simulation_data()
     
-    def extract_prices_intelligently(self, soup) -> List[int]:
+    async def extract_page_prices(self, page_url: str) -> List[int]:
+        """Await one listing page's prices from the HTTP worker; [] on failure"""
+        try:
+            full_url = f"{self.config['analysis']['target_url']}{page_url}"
+            return await self._run_request(self.scan_page_prices, full_url)
+            
+        except Exception as e:
+            self.logger.warning(f"Error extracting from {page_url}: {e}")
+            return []
+    
+    def extract_prices_intelligently(self, text_content: str) -> List[int]:
         """Intelligent price extraction"""
-        prices = []
-        
-        # Multiple intelligent strategies for price extraction
-        price_patterns = [
-            r'(\d{1,3}(?:[\.,]\d{3})*)\s*€',
-            r'€\s*(\d{1,3}(?:[\.,]\d{3})*)',
-            r'(\d{1,3}(?:[\.,]\d{3})*)\s*EUR'
-        ]
+        prices = set()  # Deduplicates as we go
         
-        text_content = soup.get_text()
+        # All price notations in one pass over the text
+        for match in _PRICE_RE.finditer(text_content):
+            raw_price = match.group(1) or match.group(2)
+            clean_price = int(raw_price.replace('.', '').replace(',', ''))
+            # Filter realistic car prices
+            if 1000 <= clean_price <= 4000000:
+                prices.add(clean_price)
         
-        for pattern in price_patterns:
-            matches = re.findall(pattern, text_content)
-            for match in matches:
-                try:
-                    clean_price = int(match.replace('.', '').replace(',', ''))
-                    # Filter realistic car prices
-                    if 1000 <= clean_price <= 4000000:
-                        prices.append(clean_price)
-                except ValueError:
-                    continue
-        
-        return list(set(prices))  # Remove duplicates
+        return list(prices)
     
-    def extract_dealer_intelligence(self, dealer_slug: str) -> Optional[Dict[str, Any]]:
+    async def extract_dealer_intelligence(self, dealer_slug: str) -> Optional[Dict[str, Any]]:
         """Extract intelligent dealer insights"""
         try:
             url = f"{self.config['analysis']['target_url']}/dealer/{dealer_slug}/"
-            response = self.make_intelligent_request(url)
             
-            if response.status_code == 404:
+            # Cheap HEAD first so stale dealer slugs never download a full page
+            head = await self.fetch_page(url, method="HEAD")
+            if head.status_code in (404, 410):
                 return None
-                
-            soup = BeautifulSoup(response.content, 'html.parser')
-            text_content = soup.get_text()
-            
-            # Intelligent listing count extraction
-            patterns = [
-                r'Anunțuri\s*\((\d+)\)',
-                r'(\d+)\s*anun',
-                r'(\d+)\s*listing'
-            ]
             
-            listing_count = 0
-            for pattern in patterns:
-                match = re.search(pattern, text_content, re.IGNORECASE)
-                if match:
-                    listing_count = int(match.group(1))
-                    break
+            listing_count = await self._run_request(self.scan_dealer_listings, url)
+            if listing_count is None:
+                return None
             
             return {
                 "name": dealer_slug,
@@ -396,28 +787,16 @@ class YourToqanAgent:
             self.logger.warning(f"Dealer extraction failed for {dealer_slug}: {e}")
             return None
     
-    def get_simulation_data(self) -> Dict[str, Any]:
-        """Fallback simulation data for demo purposes"""
-        return {
-            "total_listings": 29099,
-            "price_samples": [
-                20590, 4990, 5290, 22590, 28490, 18490, 28000, 31313, 29992, 
-                6000, 9950, 46325, 43234, 42868, 40224, 35072, 49451, 70326, 
-                141840, 147684, 118936, 121745, 88217, 59900, 640588, 232078
-            ],
-            "dealer_data": [
-                {"name": "autorulateleasing", "listing_count": 537},
-                {"name": "autodel", "listing_count": 310},
-                {"name": "parc-auto-dragoliv-sascut", "listing_count": 248},
-                {"name": "wow-auto-rulate", "listing_count": 194},
-                {"name": "radacini-auto-rulate", "listing_count": 187}
-            ],
-            "market_indicators": {"simulation_mode": True}
-        }
+    @staticmethod
+    def get_simulation_data() -> Mapping[str, Any]:
+        """Fallback simulation data for demo purposes (shared, read-only)"""
+        return _SIMULATION_DATA
     
     async def generate_ai_intelligence(self, raw_data: Dict[str, Any]) -> Dict[str, Any]:
         """Generate AI-powered market intelligence"""
-        session_id = f"intel_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        now = datetime.now()  # One clock read for the week and timestamp
+        # Nanosecond hex id: cheap, sortable, and unique even for runs within the same second
+        session_id = f"intel_{time.time_ns():x}"
         
         self.logger.info(f"🧠 Generating AI intelligence for session {session_id}")
         
@@ -425,16 +804,16 @@ class YourToqanAgent:
         await asyncio.sleep(3)
         
         # Calculate intelligent metrics
-        prices = raw_data["price_samples"]
-        if not prices:
-            prices = [40000]  # Fallback
+        prices_arr = np.asarray(raw_data["price_samples"], dtype=np.int32)
+        if prices_arr.size == 0:
+            prices_arr = np.array([40000], dtype=np.int32)  # Fallback
             
-        avg_price = sum(prices) / len(prices)
-        median_price = sorted(prices)[len(prices) // 2]
+        (avg_price, lower_quartile, median_price, upper_quartile,
+         mid_range_count, luxury_count) = _price_stats(prices_arr)
         
         # Calculate market segments
-        luxury_count = len([p for p in prices if p >= 100000])
-        luxury_percentage = (luxury_count / len(prices)) * 100
+        luxury_percentage = (luxury_count / prices_arr.size) * 100
+        mid_range_percentage = (mid_range_count / prices_arr.size) * 100
         
         # Generate AI insights with confidence scores
         insights = []
@@ -444,7 +823,7 @@ class YourToqanAgent:
             insights.append({
                 "type": "market_trend",
                 "title": "Premium Market Dominance", 
-                "description": f"Luxury vehicles represent {luxury_percentage:.1f}% of inventory, indicating strong premium market positioning and affluent buyer base.",
+                "description": f"Luxury vehicles represent {_fmt_pct1(luxury_percentage)} of inventory, indicating strong premium market positioning and affluent buyer base.",
                 "confidence": 0.92,
                 "impact": "high",
                 "recommendation": "Focus marketing on high-value customers and premium vehicle acquisition."
@@ -455,46 +834,50 @@ class YourToqanAgent:
             insights.append({
                 "type": "pricing_strategy",
                 "title": "High-Value Market Position",
-                "description": f"Average price of €{avg_price:,.0f} positions Plus-Auto.ro as premium marketplace, significantly above mass market.",
+                "description": f"Average price of {_fmt_euro(avg_price)} positions Plus-Auto.ro as premium marketplace, significantly above mass market.",
                 "confidence": 0.89,
                 "impact": "high", 
                 "recommendation": "Leverage premium positioning in marketing and dealer partnerships."
             })
         
-        # Dealer analysis
-        top_dealers = sorted(raw_data["dealer_data"], 
-                           key=lambda x: x.get("listing_count", 0), reverse=True)[:3]
+        # Dealer analysis: top-k by partitioning the listing counts, then ordering just those k
+        dealer_data = raw_data["dealer_data"]
+        dealer_names, listing_counts = _dealers_to_soa(dealer_data)
+        top_k = min(_TOP_DEALERS, listing_counts.size)
+        top_dealers = []
+        if top_k:
+            top_idx = np.argpartition(-listing_counts, top_k - 1)[:top_k]
+            # Highest count first; ties keep their scrape order
+            top_idx = top_idx[np.lexsort((top_idx, -listing_counts[top_idx]))]
+            top_dealers = [dealer_data[i] for i in top_idx]
         
         if top_dealers:
-            leader = top_dealers[0]
-            total_tracked = sum(d.get("listing_count", 0) for d in raw_data["dealer_data"])
-            market_share = (leader.get("listing_count", 0) / raw_data["total_listings"]) * 100
+            leader_name = dealer_names[top_idx[0]]
+            leader_listings = int(listing_counts[top_idx[0]])
+            market_share = (leader_listings / raw_data["total_listings"]) * 100
             
             insights.append({
                 "type": "competitive_intelligence",
-                "title": f"{leader['name'].replace('-', ' ').title()} Market Leadership",
-                "description": f"Leading dealer with {leader.get('listing_count', 0):,} listings ({market_share:.2f}% market share), demonstrating strong inventory management.",
+                "title": f"{leader_name.replace('-', ' ').title()} Market Leadership",
+                "description": f"Leading dealer with {leader_listings:,} listings ({market_share:.2f}% market share), demonstrating strong inventory management.",
                 "confidence": 0.95,
                 "impact": "medium",
                 "recommendation": "Monitor competitive responses and consider partnership opportunities."
             })
         
         # Market opportunity analysis
-        mid_range_count = len([p for p in prices if 29000 <= p < 40000])
-        mid_range_percentage = (mid_range_count / len(prices)) * 100
-        
         if mid_range_percentage < 25:
             insights.append({
                 "type": "market_opportunity",
                 "title": "Mid-Range Market Gap",
-                "description": f"Only {mid_range_percentage:.1f}% of inventory in €30-50K range suggests underserved mid-market segment.",
+                "description": f"Only {_fmt_pct1(mid_range_percentage)} of inventory in €30-50K range suggests underserved mid-market segment.",
                 "confidence": 0.83,
                 "impact": "medium",
                 "recommendation": "Encourage dealers to expand mid-range inventory for broader market coverage."
             })
         
         # Predictive insights
-        current_week = datetime.now().isocalendar()[1]
+        current_week = now.isocalendar()[1]
         if current_week % 4 == 0:  # Monthly prediction
             insights.append({
                 "type": "prediction",
@@ -515,22 +898,23 @@ class YourToqanAgent:
         
         intelligence = {
             "session_id": session_id,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now.isoformat(),
             "mode": self.mode,
             "marketplace_data": {
                 "total_listings": raw_data["total_listings"],
                 "pricing": {
                     "average": avg_price,
                     "median": median_price,
+                    "quartiles": [lower_quartile, upper_quartile],
                     "luxury_percentage": luxury_percentage,
-                    "sample_size": len(prices)
+                    "sample_size": int(prices_arr.size)
                 },
                 "trend_analysis": {
                     "dominant_segment": "luxury" if luxury_percentage > 30 else "premium",
                     "market_position": "high_value"
                 }
             },
-            "dealer_data": top_dealers[:5],
+            "dealer_data": top_dealers,
             "ai_insights": final_insights,
             "intelligence_summary": {
                 "insights_generated": len(final_insights),
@@ -543,428 +927,267 @@ class YourToqanAgent:
         return intelligence
     
     async def save_intelligence(self, intelligence: Dict[str, Any]):
-        """Save intelligence to your database"""
-        db_path = self.config["storage"]["database_path"]
-        conn = sqlite3.connect(db_path)
+        """Save intelligence to your database without blocking the event loop"""
+        await asyncio.to_thread(self._save_intelligence_sync, intelligence)
+    
+    def _save_intelligence_sync(self, intelligence: Dict[str, Any]):
+        """Blocking SQLite write of one intelligence session"""
+        self.persist([intelligence])
+    
+    def _intelligence_rows(self, intelligence: Dict[str, Any]) -> Tuple[tuple, tuple, List[tuple], List[tuple]]:
+        """Parameter tuples for every table touched by one session"""
+        session_id = intelligence["session_id"]
+        timestamp = intelligence["timestamp"]
+        summary = intelligence["intelligence_summary"]
+        marketplace = intelligence["marketplace_data"]
+        pricing = marketplace["pricing"]
+        total_listings = marketplace["total_listings"]
+        pct_per_listing = 100.0 / total_listings if total_listings > 0 else 0.0
         
-        try:
-            session_id = intelligence["session_id"]
-            timestamp = intelligence["timestamp"]
-            
-            # Save intelligence session
-            summary = intelligence["intelligence_summary"]
-            marketplace = intelligence["marketplace_data"]
-            
-            conn.execute("""
-                INSERT INTO intelligence_sessions 
-                (session_id, timestamp, mode, insights_generated, confidence_average, data_points)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (
-                session_id, timestamp, self.mode,
-                summary["insights_generated"], summary["confidence_average"],
-                marketplace["pricing"]["sample_size"]
-            ))
-            
-            # Save marketplace intelligence
-            conn.execute("""
-                INSERT INTO marketplace_intelligence
-                (session_id, timestamp, total_listings, avg_price, median_price, 
-                 luxury_percentage, market_trend, raw_data)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                session_id, timestamp,
-                marketplace["total_listings"],
-                marketplace["pricing"]["average"],
-                marketplace["pricing"]["median"], 
-                marketplace["pricing"]["luxury_percentage"],
-                marketplace["trend_analysis"]["dominant_segment"],
-                json.dumps(intelligence)
+        session_row = (
+            session_id, timestamp, self.mode,
+            summary["insights_generated"], summary["confidence_average"],
+            pricing["sample_size"]
+        )
+        market_row = (
+            session_id, timestamp,
+            total_listings,
+            pricing["average"],
+            pricing["median"], 
+            pricing["luxury_percentage"],
+            marketplace["trend_analysis"]["dominant_segment"],
+            _dump_json(intelligence).decode('utf-8')
+        )
+        dealer_rows = []
+        for dealer in intelligence["dealer_data"]:
+            listing_count = dealer.get("listing_count", 0)
+            dealer_rows.append((
+                session_id, timestamp, dealer["name"], 
+                listing_count, listing_count * pct_per_listing
             ))
+        insight_rows = [
+            (
+                session_id, timestamp, insight["type"], insight["title"],
+                insight["description"], insight["confidence"], insight["impact"],
+                insight.get("recommendation", "")
+            )
+            for insight in intelligence["ai_insights"]
+        ]
+        return session_row, market_row, dealer_rows, insight_rows
+    
+    def persist(self, intelligence_batch: List[Dict[str, Any]]):
+        """Write a batch of intelligence sessions in one transaction"""
+        if not intelligence_batch:
+            return
+        conn = self.db
+        
+        try:
+            # Build every row up front so each table is a single executemany
+            rows = [self._intelligence_rows(intelligence) for intelligence in intelligence_batch]
+            sessions = [r[0] for r in rows]
+            market = [r[1] for r in rows]
+            dealers = [row for r in rows for row in r[2]]
+            insights = [row for r in rows for row in r[3]]
             
-            # Save dealer intelligence
-            for dealer in intelligence["dealer_data"]:
-                total_listings = marketplace["total_listings"]
-                market_share = (dealer.get("listing_count", 0) / total_listings) * 100 if total_listings > 0 else 0
-                
-                conn.execute("""
-                    INSERT INTO dealer_intelligence
-                    (session_id, timestamp, dealer_name, listing_count, market_share)
-                    VALUES (?, ?, ?, ?, ?)
-                """, (
-                    session_id, timestamp, dealer["name"], 
-                    dealer.get("listing_count", 0), market_share
-                ))
-            
-            # Save AI insights
-            for insight in intelligence["ai_insights"]:
-                conn.execute("""
-                    INSERT INTO ai_insights
-                    (session_id, timestamp, insight_type, title, description, 
-                     confidence_score, impact_level, recommendation)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    session_id, timestamp, insight["type"], insight["title"],
-                    insight["description"], insight["confidence"], insight["impact"],
-                    insight.get("recommendation", "")
-                ))
+            # One transaction for the whole batch: commits on success, rolls back on error
+            with self._db_lock, conn:
+                # Take the write lock up front rather than upgrading mid-transaction
+                conn.execute("BEGIN IMMEDIATE")
+                conn.executemany(_INSERT_SESSION_SQL, sessions)
+                conn.executemany(_INSERT_MARKETPLACE_SQL, market)
+                conn.executemany(_INSERT_DEALER_SQL, dealers)
+                conn.executemany(_INSERT_INSIGHT_SQL, insights)
             
-            conn.commit()
-            self.logger.info(f"💾 Intelligence saved to database: {session_id}")
+            for session in sessions:
+                self.logger.info(f"💾 Intelligence saved to database: {session[0]}")
             
         except Exception as e:
             self.logger.error(f"Database save failed: {e}")
-            conn.rollback()
             raise
-        finally:
-            conn.close()
     
-    async def generate_intelligence_report(self, intelligence: Dict[str, Any]) -> str:
-        """Generate your personal intelligence report"""
+    def _render_insight_html(self, insight: Dict[str, Any]) -> str:
+        """Render one AI insight card for the report"""
+        insight_type, title, description, confidence, impact = _INSIGHT_FIELDS(insight)
+        recommendation = insight.get("recommendation")
+        impact_color = _IMPACT_COLORS.get(impact, "#6c757d")
         
-        marketplace = intelligence["marketplace_data"]
-        insights = intelligence["ai_insights"]
-        dealers = intelligence["dealer_data"]
-        summary = intelligence["intelligence_summary"]
+        confidence_bar_width = confidence * 100
         
-        # Generate insights HTML
-        insights_html = ""
-        for i, insight in enumerate(insights, 1):
-            impact_color = {
-                "high": "#dc3545", "medium": "#fd7e14", "low": "#28a745"
-            }.get(insight["impact"], "#6c757d")
-            
-            confidence_bar_width = insight["confidence"] * 100
-            
-            insights_html += f"""
+        return f"""
             <div class="insight-card" style="border-left: 5px solid {impact_color};">
                 <div class="insight-header">
-                    <h4>💡 {insight['title']}</h4>
+                    <h4>💡 {title}</h4>
                     <div class="confidence-badge">
                         <div class="confidence-bar">
                             <div class="confidence-fill" style="width: {confidence_bar_width}%; background: {impact_color};"></div>
                         </div>
-                        <span>{insight['confidence']:.0%} confidence</span>
+                        <span>{confidence:.0%} confidence</span>
                     </div>
                 </div>
-                <p class="insight-description">{insight['description']}</p>
-                {f'<div class="recommendation">💫 <strong>Recommendation:</strong> {insight["recommendation"]}</div>' if insight.get("recommendation") else ''}
+                <p class="insight-description">{description}</p>
+                {f'<div class="recommendation">💫 <strong>Recommendation:</strong> {recommendation}</div>' if recommendation else ''}
                 <div class="insight-meta">
-                    <span class="type-badge">{insight['type'].replace('_', ' ').title()}</span>
-                    <span class="impact-badge" style="background: {impact_color};">{insight['impact'].title()} Impact</span>
+                    <span class="type-badge">{insight_type.replace('_', ' ').title()}</span>
+                    <span class="impact-badge" style="background: {impact_color};">{impact.title()} Impact</span>
                 </div>
             </div>
             """
+    
+    def _render_dealer_row(self, rank: int, dealer: Dict[str, Any], pct_per_listing: float) -> str:
+        """Render one dealer table row for the report"""
+        listing_count = dealer.get("listing_count", 0)
         
-        # Generate dealer table
-        dealer_rows = ""
-        for i, dealer in enumerate(dealers, 1):
-            total_listings = marketplace["total_listings"]
-            market_share = (dealer.get("listing_count", 0) / total_listings) * 100 if total_listings > 0 else 0
-            
-            dealer_rows += f"""
+        return f"""
             <tr>
-                <td>{i}</td>
+                <td>{rank}</td>
                 <td style="font-weight: 600;">{dealer['name'].replace('-', ' ').title()}</td>
-                <td>{dealer.get('listing_count', 0):,}</td>
-                <td>{market_share:.2f}%</td>
+                <td>{listing_count:,}</td>
+                <td>{listing_count * pct_per_listing:.2f}%</td>
             </tr>
             """
+    
+    def generate_intelligence_report(self, intelligence: Dict[str, Any],
+                                     now: Optional[datetime] = None) -> str:
+        """Generate your personal intelligence report (pure CPU work, no I/O)"""
+        now = now or datetime.now()
         
-        # Generate the report
-        html_report = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <title>Your Plus-Auto.ro Intelligence Report</title>
-            <style>
-                * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-                body {{ 
-                    font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                    min-height: 100vh; padding: 20px;
-                }}
-                .container {{ 
-                    max-width: 1200px; margin: 0 auto; background: white;
-                    border-radius: 20px; box-shadow: 0 25px 50px rgba(0,0,0,0.15);
-                    overflow: hidden;
-                }}
-                .header {{ 
-                    background: linear-gradient(135deg, #1e3c72 0%, #2a5298 100%);
-                    color: white; padding: 40px; text-align: center; position: relative;
-                }}
-                .header::before {{
-                    content: ''; position: absolute; top: 0; left: 0; right: 0; bottom: 0;
-                    background: url('data:image/svg+xml,<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 100 100"><circle cx="20" cy="20" r="2" fill="white" opacity="0.1"/><circle cx="80" cy="40" r="1" fill="white" opacity="0.1"/><circle cx="40" cy="80" r="1.5" fill="white" opacity="0.1"/></svg>');
-                }}
-                .header * {{ position: relative; z-index: 1; }}
-                .header h1 {{ font-size: 2.8em; font-weight: 800; margin-bottom: 10px; }}
-                .header .subtitle {{ font-size: 1.3em; opacity: 0.9; }}
-                .agent-badge {{ 
-                    display: inline-block; background: rgba(255,255,255,0.2);
-                    padding: 8px 16px; border-radius: 20px; margin-top: 15px;
-                    font-weight: 600; font-size: 0.9em;
-                }}
-                
-                .overview {{ 
-                    display: grid; grid-template-columns: repeat(auto-fit, minmax(240px, 1fr));
-                    gap: 25px; padding: 40px; background: #f8f9fa;
-                }}
-                .metric-card {{ 
-                    background: white; padding: 30px; border-radius: 15px;
-                    text-align: center; box-shadow: 0 8px 25px rgba(0,0,0,0.08);
-                    transition: transform 0.3s ease; position: relative; overflow: hidden;
-                }}
-                .metric-card::before {{
-                    content: ''; position: absolute; top: 0; left: 0; width: 100%; height: 4px;
-                    background: linear-gradient(90deg, #667eea, #764ba2);
-                }}
-                .metric-card:hover {{ transform: translateY(-5px); }}
-                .metric-card h3 {{ color: #6c757d; font-size: 0.95em; margin-bottom: 15px; font-weight: 600; }}
-                .metric-card .value {{ 
-                    font-size: 2.5em; font-weight: 800; color: #2c3e50; 
-                    background: linear-gradient(135deg, #667eea, #764ba2);
-                    -webkit-background-clip: text; -webkit-text-fill-color: transparent;
-                    background-clip: text; margin-bottom: 5px;
-                }}
-                .metric-card .subvalue {{ font-size: 0.85em; color: #6c757d; }}
-                
-                .content {{ padding: 40px; }}
-                .section {{ margin: 40px 0; }}
-                .section-title {{ 
-                    font-size: 2em; font-weight: 700; color: #2c3e50; 
-                    margin-bottom: 25px; display: flex; align-items: center; gap: 15px;
-                }}
-                .section-title::after {{
-                    content: ''; flex: 1; height: 3px; 
-                    background: linear-gradient(90deg, #667eea, transparent);
-                }}
-                
-                .insights-grid {{ display: grid; gap: 25px; }}
-                .insight-card {{ 
-                    background: white; padding: 25px; border-radius: 15px;
-                    box-shadow: 0 8px 25px rgba(0,0,0,0.08); position: relative;
-                }}
-                .insight-header {{ 
-                    display: flex; justify-content: space-between; align-items: flex-start;
-                    margin-bottom: 15px; flex-wrap: wrap; gap: 15px;
-                }}
-                .insight-header h4 {{ 
-                    margin: 0; color: #2c3e50; font-size: 1.2em; font-weight: 700; flex: 1;
-                }}
-                .confidence-badge {{ 
-                    display: flex; align-items: center; gap: 10px; font-size: 0.85em;
-                }}
-                .confidence-bar {{
-                    width: 60px; height: 6px; background: #e9ecef; border-radius: 3px; overflow: hidden;
-                }}
-                .confidence-fill {{ height: 100%; border-radius: 3px; }}
-                .confidence-badge span {{ font-weight: 600; color: #495057; }}
-                .insight-description {{ 
-                    color: #495057; line-height: 1.6; margin-bottom: 15px; font-size: 1.05em;
-                }}
-                .recommendation {{ 
-                    background: #f8f9fa; padding: 15px; border-radius: 10px; 
-                    border-left: 4px solid #28a745; margin: 15px 0; font-size: 0.95em;
-                }}
-                .insight-meta {{ 
-                    display: flex; gap: 10px; flex-wrap: wrap; margin-top: 15px;
-                }}
-                .type-badge, .impact-badge {{ 
-                    padding: 6px 12px; border-radius: 20px; font-size: 0.8em; 
-                    font-weight: 600; color: white;
-                }}
-                .type-badge {{ background: #6c757d; }}
-                
-                .data-table {{ 
-                    width: 100%; border-collapse: collapse; margin: 25px 0;
-                    background: white; border-radius: 15px; overflow: hidden;
-                    box-shadow: 0 8px 25px rgba(0,0,0,0.08);
-                }}
-                .data-table th {{ 
-                    background: linear-gradient(135deg, #667eea, #764ba2); 
-                    color: white; padding: 20px; text-align: left; font-weight: 600; font-size: 1.05em;
-                }}
-                .data-table td {{ padding: 18px 20px; border-bottom: 1px solid #f1f3f5; }}
-                .data-table tr:last-child td {{ border-bottom: none; }}
-                .data-table tr:hover {{ background: #f8f9fa; }}
-                
-                .summary-section {{
-                    background: linear-gradient(135deg, #f8f9fa, #e9ecef); 
-                    padding: 30px; border-radius: 15px; margin: 30px 0;
-                }}
-                .summary-grid {{ 
-                    display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); 
-                    gap: 20px; margin-top: 20px;
-                }}
-                .summary-item {{ text-align: center; }}
-                .summary-item .number {{ 
-                    font-size: 2em; font-weight: 800; color: #667eea; margin-bottom: 5px;
-                }}
-                .summary-item .label {{ font-size: 0.9em; color: #6c757d; font-weight: 600; }}
-                
-                .footer {{ 
-                    background: #2c3e50; color: white; padding: 30px; text-align: center;
-                }}
-                .footer-grid {{ 
-                    display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); 
-                    gap: 20px; margin-bottom: 20px;
-                }}
-                .footer-item {{ }}
-                .footer-item h4 {{ color: #ecf0f1; margin-bottom: 10px; }}
-                .footer-item p {{ opacity: 0.8; font-size: 0.9em; }}
-                .footer-note {{ 
-                    border-top: 1px solid #34495e; padding-top: 20px; opacity: 0.7; font-size: 0.85em;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>🚗 Your Intelligence Report</h1>
-                    <div class="subtitle">Plus-Auto.ro Marketplace Analysis</div>
-                    <div class="agent-badge">🤖 Powered by Your Personal Toqan Agent</div>
-                </div>
-                
-                <div class="overview">
-                    <div class="metric-card">
-                        <h3>Total Marketplace</h3>
-                        <div class="value">{marketplace['total_listings']:,}</div>
-                        <div class="subvalue">Active Listings</div>
-                    </div>
-                    <div class="metric-card">
-                        <h3>Average Price</h3>
-                        <div class="value">€{marketplace['pricing']['average']:,.0f}</div>
-                        <div class="subvalue">Market Average</div>
-                    </div>
-                    <div class="metric-card">
-                        <h3>Luxury Share</h3>
-                        <div class="value">{marketplace['pricing']['luxury_percentage']:.1f}%</div>
-                        <div class="subvalue">Premium Market</div>
-                    </div>
-                    <div class="metric-card">
-                        <h3>AI Insights</h3>
-                        <div class="value">{summary['insights_generated']}</div>
-                        <div class="subvalue">{summary['confidence_average']:.0%} Avg Confidence</div>
-                    </div>
-                </div>
-                
-                <div class="content">
-                    <div class="section">
-                        <h2 class="section-title">🧠 AI Intelligence Insights</h2>
-                        <div class="insights-grid">
-                            {insights_html}
-                        </div>
-                    </div>
-                    
-                    <div class="section">
-                        <h2 class="section-title">🏪 Top Dealer Performance</h2>
-                        <table class="data-table">
-                            <thead>
-                                <tr>
-                                    <th>Rank</th>
-                                    <th>Dealer Name</th>
-                                    <th>Active Listings</th>
-                                    <th>Market Share</th>
-                                </tr>
-                            </thead>
-                            <tbody>
-                                {dealer_rows}
-                            </tbody>
-                        </table>
-                    </div>
-                    
-                    <div class="summary-section">
-                        <h3 style="text-align: center; color: #2c3e50; margin-bottom: 10px;">📊 Intelligence Summary</h3>
-                        <div class="summary-grid">
-                            <div class="summary-item">
-                                <div class="number">{summary['high_impact_insights']}</div>
-                                <div class="label">High Impact Insights</div>
-                            </div>
-                            <div class="summary-item">
-                                <div class="number">{summary['recommendations_count']}</div>
-                                <div class="label">Actionable Recommendations</div>
-                            </div>
-                            <div class="summary-item">
-                                <div class="number">{marketplace['pricing']['sample_size']:,}</div>
-                                <div class="label">Data Points Analyzed</div>
-                            </div>
-                            <div class="summary-item">
-                                <div class="number">{summary['confidence_average']:.0%}</div>
-                                <div class="label">Average Confidence</div>
-                            </div>
-                        </div>
-                    </div>
-                </div>
-                
-                <div class="footer">
-                    <div class="footer-grid">
-                        <div class="footer-item">
-                            <h4>🤖 Your AI Agent</h4>
-                            <p>Personal Toqan Intelligence Agent</p>
-                            <p>Mode: {intelligence['mode']}</p>
-                        </div>
-                        <div class="footer-item">
-                            <h4>📅 Report Details</h4>
-                            <p>Generated: {datetime.now().strftime('%B %d, %Y')}</p>
-                            <p>Session: {intelligence['session_id']}</p>
-                        </div>
-                        <div class="footer-item">
-                            <h4>📊 Data Quality</h4>
-                            <p>Confidence: {summary['confidence_average']:.0%}</p>
-                            <p>Insights: {summary['insights_generated']} generated</p>
-                        </div>
-                    </div>
-                    <div class="footer-note">
-                        Report generated by Your Personal Toqan Agent | AI-Powered Marketplace Intelligence
-                    </div>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
+        marketplace = intelligence["marketplace_data"]
+        insights = intelligence["ai_insights"]
+        dealers = intelligence["dealer_data"]
+        summary = intelligence["intelligence_summary"]
+        
+        # Generate insights HTML
+        insights_html = "".join([self._render_insight_html(insight) for insight in insights])
+        
+        # Generate dealer table
+        total_listings = marketplace["total_listings"]
+        pct_per_listing = 100.0 / total_listings if total_listings > 0 else 0.0
+        dealer_rows = "".join([
+            self._render_dealer_row(i, dealer, pct_per_listing)
+            for i, dealer in enumerate(dealers, 1)
+        ])
+        
+        # Fill the report skeleton
+        pricing = marketplace["pricing"]
+        confidence_average = f"{summary['confidence_average']:.0%}"
+        html_report = _render_report(
+            total_listings=f"{total_listings:,}",
+            average_price=_fmt_euro(pricing['average']),
+            luxury_percentage=_fmt_pct1(pricing['luxury_percentage']),
+            insights_generated=summary["insights_generated"],
+            confidence_average=confidence_average,
+            insights_html=insights_html,
+            dealer_rows=dealer_rows,
+            high_impact_insights=summary["high_impact_insights"],
+            recommendations_count=summary["recommendations_count"],
+            sample_size=f"{pricing['sample_size']:,}",
+            mode=intelligence["mode"],
+            generated_date=now.strftime('%B %d, %Y'),
+            session_id=intelligence["session_id"]
+        )
         
         return html_report
     
-    async def send_intelligence_report(self, report_html: str, intelligence: Dict[str, Any]):
+    async def send_intelligence_report(self, report_html: str, intelligence: Dict[str, Any],
+                                       now: Optional[datetime] = None,
+                                       report_gz: Optional[bytes] = None):
         """Send your intelligence report"""
-        if not self.config["email"]["recipients"]:
+        recipients = self.config["email"]["recipients"]
+        if not recipients:
             self.logger.warning("No email recipients configured")
             return
             
         try:
-            subject = f"{self.config['reporting']['subject_prefix']} - {datetime.now().strftime('%Y-%m-%d')}"
+            now = now or datetime.now()
+            subject = f"{self.config['reporting']['subject_prefix']} - {now.strftime('%Y-%m-%d')}"
             
-            msg = MIMEMultipart('alternative')
+            msg = EmailMessage()
             msg['Subject'] = subject
-            msg['From'] = self.config["email"]["sender_email"]
-            msg['To'] = ', '.join(self.config["email"]["recipients"])
+            msg['From'] = self._sender_email
+            msg['To'] = self._recipients_hdr
             msg['X-Agent'] = 'YourPersonalToqanAgent/1.0'
             
-            html_part = MIMEText(report_html, 'html', 'utf-8')
-            msg.attach(html_part)
+            msg.set_content("This intelligence report needs an HTML-capable mail client.")
+            # Report lines stay well under the 998-octet limit, so skip quoted-printable;
+            # _send_sync re-encodes it for servers without 8BITMIME
+            msg.add_alternative(report_html, subtype='html', cte='8bit')
             
-            server = smtplib.SMTP(self.config["email"]["smtp_server"], 
-                                self.config["email"]["smtp_port"])
-            server.starttls()
-            server.login(self.config["email"]["sender_email"], 
-                        self.config["email"]["sender_password"])
-            server.send_message(msg)
-            server.quit()
+            # Compact copy for archiving/forwarding; reuse the archive bytes when given
+            if report_gz is None:
+                report_gz = _compress_report(report_html)
+            msg.add_attachment(report_gz, 'application', 'gzip',
+                               filename=f"intelligence_report_{intelligence['session_id']}.html.gz")
             
-            self.logger.info(f"📧 Intelligence report sent to {len(self.config['email']['recipients'])} recipients")
+            # smtplib blocks for every round trip, so deliver from a worker thread
+            await asyncio.to_thread(self._send_sync, msg)
+            
+            self.logger.info(f"📧 Intelligence report sent to {len(recipients)} recipients")
             
         except Exception as e:
             self.logger.error(f"Failed to send report: {e}")
     
+    def _send_sync(self, msg: EmailMessage):
+        """Blocking SMTP delivery over the cached connection"""
+        server = self._get_smtp()
+        if server.has_extn('8bitmime'):
+            # Declare the raw 8-bit body as RFC 6152 requires
+            server.send_message(msg, mail_options=('BODY=8BITMIME',))
+            return
+        
+        # 7-bit-only server: fall back to quoted-printable for the 8-bit parts
+        for part in msg.walk():
+            if part['Content-Transfer-Encoding'] == '8bit':
+                part.set_content(part.get_content(), subtype=part.get_content_subtype(),
+                                 cte='quoted-printable')
+        server.send_message(msg)
+    
+    def _get_smtp(self) -> smtplib.SMTP:
+        """Return a live, authenticated SMTP connection, reconnecting only when needed"""
+        if self._smtp is not None:
+            try:
+                self._smtp.noop()
+                return self._smtp
+            except (smtplib.SMTPServerDisconnected, OSError):
+                self._smtp = None
+        
+        email_cfg = self.config["email"]
+        server = smtplib.SMTP(email_cfg["smtp_server"], email_cfg["smtp_port"])
+        try:
+            server.starttls()
+            server.login(email_cfg["sender_email"], email_cfg["sender_password"])
+        except Exception:
+            server.close()
+            raise
+        self._smtp = server
+        return server
+    
+    async def aclose(self):
+        """Release the agent's HTTP session and workers, SMTP connection and database"""
+        await asyncio.to_thread(self._close_smtp)
+        self._http_executor.shutdown()
+        self.session.close()  # Drops the pooled keep-alive sockets
+        with self._db_lock:
+            # Don't let the exit hook pin a finished agent's connection
+            atexit.unregister(self.db.close)
+            self.db.close()
+    
+    def _close_smtp(self):
+        """Politely close the cached SMTP connection, if any"""
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                self._smtp.close()
+            self._smtp = None
+    
     async def run_weekly_intelligence(self):
         """Run your weekly intelligence analysis"""
-        start_time = datetime.now()
+        start_time = datetime.now()  # Also dates the report and email subject
         self.logger.info("🚀 Starting your weekly intelligence analysis...")
         
         try:
             # Extract marketplace data
-            raw_data = self.extract_marketplace_data()
+            raw_data = await self.extract_marketplace_data()
             
             # 🔍 Validate scraped data quality
             validation_results = self.validate_marketplace_data(raw_data)
@@ -982,33 +1205,35 @@ class YourToqanAgent:
             # Generate AI intelligence
             intelligence = await self.generate_ai_intelligence(raw_data)
             
-            # Save to your database
-            await self.save_intelligence(intelligence)
-            
-            # Generate your report
-            report_html = await self.generate_intelligence_report(intelligence)
+            # Generate your report off the event loop
+            report_html = await asyncio.to_thread(self.generate_intelligence_report, intelligence, start_time)
+            report_gz = await asyncio.to_thread(_compress_report, report_html)
             
-            # Save report file
-            reports_dir = self.config["storage"]["reports_directory"]
-            os.makedirs(reports_dir, exist_ok=True)
+            report_filename = os.path.join(self._reports_dir, f"intelligence_report_{intelligence['session_id']}.html.gz")
             
-            report_filename = f"{reports_dir}intelligence_report_{intelligence['session_id']}.html"
-            with open(report_filename, 'w', encoding='utf-8') as f:
-                f.write(report_html)
-            
-            # Send via email
-            await self.send_intelligence_report(report_html, intelligence)
+            # Database save, report file and email are independent - overlap them,
+            # but let all three finish before surfacing a failure
+            outcomes = await asyncio.gather(
+                self.save_intelligence(intelligence),
+                asyncio.to_thread(_write_report_file, report_filename, report_gz),
+                self.send_intelligence_report(report_html, intelligence, start_time, report_gz),
+                return_exceptions=True
+            )
+            for outcome in outcomes:
+                if isinstance(outcome, BaseException):
+                    raise outcome
             
             execution_time = (datetime.now() - start_time).total_seconds()
+            summary = intelligence["intelligence_summary"]
             
             result = {
                 "success": True,
                 "session_id": intelligence["session_id"],
                 "mode": self.mode,
                 "execution_time": f"{execution_time:.1f}s",
-                "insights_generated": intelligence["intelligence_summary"]["insights_generated"],
-                "confidence_average": intelligence["intelligence_summary"]["confidence_average"],
-                "high_impact_insights": intelligence["intelligence_summary"]["high_impact_insights"],
+                "insights_generated": summary["insights_generated"],
+                "confidence_average": summary["confidence_average"],
+                "high_impact_insights": summary["high_impact_insights"],
                 "report_saved": report_filename,
                 "email_sent": len(self.config["email"]["recipients"]) > 0
             }
@@ -1027,7 +1252,10 @@ class YourToqanAgent:
 async def run_your_agent():
     """Run your personal Toqan agent"""
     agent = YourToqanAgent()
-    result = await agent.run_weekly_intelligence()
+    try:
+        result = await agent.run_weekly_intelligence()
+    finally:
+        await agent.aclose()
     
     print(f"\n🎯 YOUR AGENT EXECUTION RESULTS:")
     print(f"   Success: {result['success']}")